@@ -8,5 +8,8 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    HISTORY_CACHE_CHAT_SIZE: int = int(os.getenv("HISTORY_CACHE_CHAT_SIZE", 100))
+    HISTORY_CACHE_MAX_MESSAGES: int = int(os.getenv("HISTORY_CACHE_MAX_MESSAGES", 100000))
+    HISTORY_CACHE_TTL_SECONDS: float = float(os.getenv("HISTORY_CACHE_TTL_SECONDS", 2))
 
 settings = Settings()
\ No newline at end of file
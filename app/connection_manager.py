@@ -1,11 +1,13 @@
 from fastapi import WebSocket
 from typing import Dict, List
+from contextlib import asynccontextmanager
 import asyncio
 
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[int, List[WebSocket]] = {}
         self.chat_locks: Dict[int, asyncio.Lock] = {}
+        self.chat_lock_holders: Dict[int, int] = {}
 
     async def connect(self, user_id: int, websocket: WebSocket):
         await websocket.accept()
@@ -33,4 +35,19 @@ class ConnectionManager:
             self.chat_locks[chat_id] = asyncio.Lock()
         return self.chat_locks[chat_id]
 
+    @asynccontextmanager
+    async def chat_lock(self, chat_id: int):
+        # Drops the lock once nobody holds or waits for it, so chat_locks only
+        # grows with the number of chats being written to right now.
+        lock = self.get_chat_lock(chat_id)
+        self.chat_lock_holders[chat_id] = self.chat_lock_holders.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self.chat_lock_holders[chat_id] -= 1
+            if not self.chat_lock_holders[chat_id]:
+                del self.chat_lock_holders[chat_id]
+                del self.chat_locks[chat_id]
+
 manager = ConnectionManager()
\ No newline at end of file
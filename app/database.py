@@ -1,8 +1,15 @@
+from alembic.runtime.migration import MigrationContext
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 from app.config import settings
 
+# Head revision in migrations/versions; bump it together with every new
+# revision (tests/test_migrations.py checks that the two agree). Revisions are
+# numbered sequentially and must stay compatible with the previous release, so
+# a worker accepts its own revision or any newer one during a rolling deploy.
+SCHEMA_REVISION = "0002"
+
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=True,
@@ -15,3 +22,16 @@ async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False
 async def get_db():
     async with async_session() as session:
         yield session
+
+def get_current_revision(connection) -> str:
+    return MigrationContext.configure(connection).get_current_revision()
+
+async def check_schema_version():
+    # Migrations are applied once by `alembic upgrade head`; workers only
+    # verify that the database is at the revision this code expects.
+    async with engine.connect() as conn:
+        current = await conn.run_sync(get_current_revision)
+    if current is None or int(current) < int(SCHEMA_REVISION):
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {SCHEMA_REVISION} or newer. Run `alembic upgrade head`."
+        )
@@ -0,0 +1,129 @@
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Deque, Iterable, List, Optional
+from app.config import settings
+
+
+def message_to_dict(message) -> dict:
+    return {
+        "id": message.id,
+        "chat_id": message.chat_id,
+        "sender_id": message.sender_id,
+        "text": message.text,
+        "timestamp": message.timestamp,
+        "read": bool(message.read),
+    }
+
+
+class ChatTail:
+    # Newest messages of a chat in timestamp order, plus the total number of
+    # messages in the chat so offset-based pages can be mapped onto the tail.
+    def __init__(self, size: int, total: int, messages: Iterable[dict], loaded_at: float):
+        self.messages: Deque[dict] = deque(messages, maxlen=size)
+        self.total = total
+        self.loaded_at = loaded_at
+
+    @property
+    def start(self) -> int:
+        return self.total - len(self.messages)
+
+
+class HistoryCache:
+    # Tails are per-process. Writes made by other workers are only picked up
+    # when a tail is reloaded from the database, so every tail expires `ttl`
+    # seconds after it was loaded; that is the staleness bound across workers.
+    def __init__(self, chat_size: int, max_messages: int, ttl: float):
+        self.chat_size = chat_size
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.chats: "OrderedDict[int, ChatTail]" = OrderedDict()
+        self.size = 0
+        self.writes = 0
+        self.versions: "OrderedDict[int, int]" = OrderedDict()
+        self.version_floor = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.chat_size > 0 and self.ttl > 0
+
+    def version(self, chat_id: int) -> int:
+        return self.versions.get(chat_id, self.version_floor)
+
+    def fill(self, chat_id: int, total: int, messages: Iterable[dict], version: Optional[int] = None):
+        # `version` is self.version(chat_id) taken before the messages were
+        # read; if the chat was written since, the snapshot may be missing it.
+        if not self.enabled or (version is not None and version != self.version(chat_id)):
+            return
+        self.evict(chat_id)
+        tail = ChatTail(self.chat_size, total, messages, time.monotonic())
+        self.chats[chat_id] = tail
+        self.size += len(tail.messages) + 1
+        self._shrink()
+
+    def evict(self, chat_id: int):
+        tail = self.chats.pop(chat_id, None)
+        if tail is not None:
+            self.size -= len(tail.messages) + 1
+
+    def append(self, message):
+        self._bump(message.chat_id)
+        tail = self._get(message.chat_id)
+        if tail is None or any(cached["id"] == message.id for cached in tail.messages):
+            return
+        if len(tail.messages) < tail.messages.maxlen:
+            self.size += 1
+        tail.messages.append(message_to_dict(message))
+        tail.total += 1
+        self.chats.move_to_end(message.chat_id)
+        self._shrink()
+
+    def mark_read(self, chat_id: int, message_id: int):
+        self._bump(chat_id)
+        tail = self._get(chat_id)
+        if tail is None:
+            return
+        for cached in tail.messages:
+            if cached["id"] == message_id:
+                cached["read"] = True
+                break
+
+    def get_page(self, chat_id: int, offset: int, limit: int) -> Optional[List[dict]]:
+        tail = self._get(chat_id)
+        if tail is None or offset < 0 or limit < 0 or offset < tail.start:
+            return None
+        self.chats.move_to_end(chat_id)
+        begin = offset - tail.start
+        return [dict(m) for m in islice(tail.messages, begin, begin + limit)]
+
+    def _get(self, chat_id: int) -> Optional[ChatTail]:
+        tail = self.chats.get(chat_id)
+        if tail is not None and time.monotonic() - tail.loaded_at >= self.ttl:
+            self.evict(chat_id)
+            return None
+        return tail
+
+    def _bump(self, chat_id: int):
+        # Versions of the least recently written chats are dropped to bound the
+        # dict; version_floor stays at or above every dropped value, so a fill
+        # that started before a dropped write still sees a changed version.
+        self.writes += 1
+        self.versions[chat_id] = self.writes
+        self.versions.move_to_end(chat_id)
+        while len(self.versions) > self.max_messages:
+            _, dropped = self.versions.popitem(last=False)
+            self.version_floor = max(self.version_floor, dropped)
+
+    def _shrink(self):
+        # Every cached chat costs one slot on top of its messages, so empty
+        # tails of idle chats are also bounded by the global limit.
+        while self.size > self.max_messages and self.chats:
+            _, tail = self.chats.popitem(last=False)
+            self.size -= len(tail.messages) + 1
+
+
+history_cache = HistoryCache(
+    settings.HISTORY_CACHE_CHAT_SIZE,
+    settings.HISTORY_CACHE_MAX_MESSAGES,
+    settings.HISTORY_CACHE_TTL_SECONDS
+)
@@ -1,7 +1,6 @@
 from fastapi import FastAPI
 from app.routes import auth, chat
-from app.database import engine
-from app.models import Base
+from app.database import check_schema_version
 
 app = FastAPI()
 
@@ -10,8 +9,7 @@ app.include_router(chat.router, prefix="/chat", tags=["chat"])
 
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await check_schema_version()
 
 if __name__ == "__main__":
     import uvicorn
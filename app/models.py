@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, Enum, Table, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, Index, Enum, Table, Boolean, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 import datetime
@@ -23,11 +23,13 @@ class User(Base):
 association_table = Table(
     "user_group", Base.metadata,
     Column("user_id", Integer, ForeignKey("users.id")),
-    Column("group_id", Integer, ForeignKey("groups.id"))
+    Column("group_id", Integer, ForeignKey("groups.id")),
+    Index("ix_user_group_group_id", "group_id")
 )
 
 class Chat(Base):
     __tablename__ = "chats"
+    __table_args__ = (Index("ix_chats_name_type", "name", "type"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
@@ -49,7 +51,10 @@ class Group(Base):
 
 class Message(Base):
     __tablename__ = "messages"
-    __table_args__ = (UniqueConstraint("dedup_key", name="uq_message_dedup_key"),)
+    __table_args__ = (
+        UniqueConstraint("dedup_key", name="uq_message_dedup_key"),
+        Index("ix_messages_chat_id_timestamp", "chat_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     chat_id = Column(Integer, ForeignKey("chats.id"), nullable=False)
@@ -9,16 +9,31 @@ from app.dependencies import get_current_user, get_db
 from app.models import Message, Chat, Group, User
 from app.schemas import MessageCreate, MessageOut, GroupCreate, GroupOut, ChatType
 from app.connection_manager import manager
+from app.history_cache import history_cache, message_to_dict
 
 router = APIRouter()
 
 @router.get("/history/{chat_id}", response_model=List[MessageOut])
-async def get_history(chat_id: int, limit: int = Query(100), offset: int = Query(0), db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
+async def get_history(chat_id: int, limit: int = Query(100, ge=0), offset: int = Query(0, ge=0), db: AsyncSession = Depends(get_db), current_user = Depends(get_current_user)):
+    cached = history_cache.get_page(chat_id, offset, limit)
+    if cached is not None:
+        return cached
+
+    version = history_cache.version(chat_id)
     result = await db.execute(
-        select(Message).where(Message.chat_id == chat_id).order_by(Message.timestamp).offset(offset).limit(limit)
+        select(Message).where(Message.chat_id == chat_id).order_by(Message.timestamp, Message.id).offset(offset).limit(limit + 1)
     )
     messages = result.scalars().all()
-    return messages
+    # One extra row tells whether this page reaches the end of the chat; if it
+    # does, the page is the newest part of the chat and can seed the tail.
+    if 0 < len(messages) <= limit:
+        history_cache.fill(
+            chat_id,
+            offset + len(messages),
+            [message_to_dict(m) for m in messages[-history_cache.chat_size:]],
+            version
+        )
+    return messages[:limit]
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket, token: str = Query(...), chat_id: int = Query(...), db: AsyncSession = Depends(get_db)):
@@ -41,8 +56,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(...), chat
             dedup_source = f"{user_id}_{chat_id}_{text}"
             dedup_key = hashlib.md5(dedup_source.encode()).hexdigest()
 
-            chat_lock = manager.get_chat_lock(chat_id)
-            async with chat_lock:
+            async with manager.chat_lock(chat_id):
                 result = await db.execute(select(Message).where(Message.dedup_key == dedup_key))
                 existing_message = result.scalars().first()
                 if existing_message:
@@ -62,6 +76,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(...), chat
                     await db.rollback()
                     raise HTTPException(status_code=500, detail="Error saving message")
                 await db.refresh(new_message)
+                history_cache.append(new_message)
 
             await manager.send_personal_message(json.dumps({
                 "id": new_message.id,
@@ -90,6 +105,7 @@ async def create_message(message: MessageCreate,
             db.add(chat_obj)
             await db.commit()
             await db.refresh(chat_obj)
+            history_cache.fill(chat_obj.id, 0, [])
         elif chat_obj is None:
             raise HTTPException(status_code=404, detail="Chat not found")
     else:
@@ -105,6 +121,7 @@ async def create_message(message: MessageCreate,
             db.add(chat_obj)
             await db.commit()
             await db.refresh(chat_obj)
+            history_cache.fill(chat_obj.id, 0, [])
 
     final_chat_id = chat_obj.id
 
@@ -116,16 +133,18 @@ async def create_message(message: MessageCreate,
     if existing_message:
         raise HTTPException(status_code=400, detail="Message already exists")
 
-    new_message = Message(
-        chat_id=final_chat_id,
-        sender_id=current_user.id,
-        text=message.text,
-        dedup_key=dedup_key,
-        timestamp=datetime.datetime.utcnow()
-    )
-    db.add(new_message)
-    await db.commit()
-    await db.refresh(new_message)
+    async with manager.chat_lock(final_chat_id):
+        new_message = Message(
+            chat_id=final_chat_id,
+            sender_id=current_user.id,
+            text=message.text,
+            dedup_key=dedup_key,
+            timestamp=datetime.datetime.utcnow()
+        )
+        db.add(new_message)
+        await db.commit()
+        await db.refresh(new_message)
+        history_cache.append(new_message)
     return new_message
 
 
@@ -136,6 +155,7 @@ async def create_group(group: GroupCreate, current_user=Depends(get_current_user
     db.add(new_chat)
     await db.commit()
     await db.refresh(new_chat)
+    history_cache.fill(new_chat.id, 0, [])
     
     new_group = Group(name=group.name, creator_id=current_user.id, chat_id=new_chat.id)
     result = await db.execute(select(User).where(User.id.in_(group.participant_ids)))
@@ -167,6 +187,7 @@ async def mark_message_read(message_id: int, current_user = Depends(get_current_
         raise HTTPException(status_code=404, detail="Message not found")
     message_obj.read = True
     await db.commit()
+    history_cache.mark_read(message_obj.chat_id, message_obj.id)
     await db.refresh(message_obj)
     await manager.send_personal_message(json.dumps({
         "id": message_obj.id,
@@ -0,0 +1,50 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from app.config import settings
+from app.models import Base
+
+config = context.config
+
+# Callers such as the test suite may hand over an open connection instead of
+# letting the migrations create their own engine.
+connection = config.attributes.get("connection")
+
+if config.config_file_name is not None and connection is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online():
+    connectable = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    do_run_migrations(connection)
+else:
+    asyncio.run(run_migrations_online())
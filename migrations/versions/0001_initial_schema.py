@@ -0,0 +1,87 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "chats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("type", sa.Enum("private", "group", name="chattype"), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_chats_id", "chats", ["id"])
+
+    op.create_table(
+        "groups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("creator_id", sa.Integer(), nullable=True),
+        sa.Column("chat_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["creator_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["chat_id"], ["chats.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_groups_id", "groups", ["id"])
+
+    op.create_table(
+        "user_group",
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("group_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+    )
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("chat_id", sa.Integer(), nullable=False),
+        sa.Column("sender_id", sa.Integer(), nullable=False),
+        sa.Column("text", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=True),
+        sa.Column("read", sa.Boolean(), nullable=True),
+        sa.Column("dedup_key", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["chat_id"], ["chats.id"]),
+        sa.ForeignKeyConstraint(["sender_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("dedup_key", name="uq_message_dedup_key"),
+    )
+    op.create_index("ix_messages_id", "messages", ["id"])
+
+
+def downgrade():
+    op.drop_index("ix_messages_id", table_name="messages")
+    op.drop_table("messages")
+    op.drop_table("user_group")
+    op.drop_index("ix_groups_id", table_name="groups")
+    op.drop_table("groups")
+    op.drop_index("ix_chats_id", table_name="chats")
+    op.drop_table("chats")
+    sa.Enum(name="chattype").drop(op.get_bind(), checkfirst=True)
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,27 @@
+"""indexes for history, private chat and group participant lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_messages_chat_id_timestamp", "messages", ["chat_id", "timestamp"])
+    op.create_index("ix_chats_name_type", "chats", ["name", "type"])
+    op.create_index("ix_user_group_group_id", "user_group", ["group_id"])
+
+
+def downgrade():
+    op.drop_index("ix_user_group_group_id", table_name="user_group")
+    op.drop_index("ix_chats_name_type", table_name="chats")
+    op.drop_index("ix_messages_chat_id_timestamp", table_name="messages")
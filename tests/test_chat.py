@@ -1,8 +1,28 @@
+import json
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.testclient import TestClient
+from app.main import app
+from app.connection_manager import manager
 from app.models import User, Chat
 from app.utils import get_password_hash, create_access_token
+from app.history_cache import history_cache
 from datetime import timedelta
 
+@pytest.fixture
+def message_queries(monkeypatch):
+    queries = []
+    execute = AsyncSession.execute
+
+    async def counting_execute(self, statement, *args, **kwargs):
+        if "FROM messages" in str(statement):
+            queries.append(statement)
+        return await execute(self, statement, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncSession, "execute", counting_execute)
+    monkeypatch.setattr(history_cache, "ttl", 60)
+    return queries
+
 @pytest.mark.asyncio
 async def test_history_endpoint(client, db_session):
     user = User(name="TestUser", email="test@example.com", hashed_password=get_password_hash("1234"))
@@ -164,3 +184,124 @@ async def test_create_group_and_mark_message_read(client, db_session):
     assert response_patch.status_code == 200, response_patch.text
     patched_data = response_patch.json()
     assert patched_data["read"] is True
+
+@pytest.mark.asyncio
+async def test_history_reflects_new_and_read_messages(client, db_session, message_queries):
+    user = User(name="HistoryReader", email="historyreader@example.com", hashed_password=get_password_hash("password"))
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    chat = Chat(name="History Chat", type="private")
+    db_session.add(chat)
+    await db_session.commit()
+    await db_session.refresh(chat)
+
+    token = create_access_token(data={"sub": str(user.id)}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get(f"/chat/history/{chat.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+    first = await client.post("/chat/message", json={"chat_id": chat.id, "text": "first"}, headers=headers)
+    second = await client.post("/chat/message", json={"chat_id": chat.id, "text": "second"}, headers=headers)
+    assert first.status_code == 200, first.text
+    assert second.status_code == 200, second.text
+
+    response_patch = await client.patch(f"/chat/message/{first.json()['id']}/read", headers=headers)
+    assert response_patch.status_code == 200, response_patch.text
+
+    response = await client.get(f"/chat/history/{chat.id}", headers=headers)
+    assert response.status_code == 200
+    history = response.json()
+    assert [m["text"] for m in history] == ["first", "second"]
+    assert [m["read"] for m in history] == [True, False]
+
+    message_queries.clear()
+    response = await client.get(f"/chat/history/{chat.id}?offset=1&limit=1", headers=headers)
+    assert [m["text"] for m in response.json()] == ["second"]
+    assert message_queries == []
+
+@pytest.mark.asyncio
+async def test_history_outside_cached_tail_reads_database(client, db_session, message_queries, monkeypatch):
+    monkeypatch.setattr(history_cache, "chat_size", 2)
+    user = User(name="TailReader", email="tailreader@example.com", hashed_password=get_password_hash("password"))
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    chat = Chat(name="Tail Chat", type="private")
+    db_session.add(chat)
+    await db_session.commit()
+    await db_session.refresh(chat)
+
+    token = create_access_token(data={"sub": str(user.id)}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for text in ("one", "two", "three"):
+        response = await client.post("/chat/message", json={"chat_id": chat.id, "text": text}, headers=headers)
+        assert response.status_code == 200, response.text
+
+    response = await client.get(f"/chat/history/{chat.id}", headers=headers)
+    assert [m["text"] for m in response.json()] == ["one", "two", "three"]
+
+    message_queries.clear()
+    response = await client.get(f"/chat/history/{chat.id}?offset=1", headers=headers)
+    assert [m["text"] for m in response.json()] == ["two", "three"]
+    assert message_queries == []
+
+    response = await client.get(f"/chat/history/{chat.id}?offset=0&limit=2", headers=headers)
+    assert [m["text"] for m in response.json()] == ["one", "two"]
+    assert len(message_queries) == 1
+
+@pytest.mark.asyncio
+async def test_websocket_message_is_served_from_cache(client, db_session, message_queries):
+    user = User(name="SocketWriter", email="socketwriter@example.com", hashed_password=get_password_hash("password"))
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    chat = Chat(name="Socket Chat", type="private")
+    db_session.add(chat)
+    await db_session.commit()
+    await db_session.refresh(chat)
+
+    token = create_access_token(data={"sub": str(user.id)}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.post("/chat/message", json={"chat_id": chat.id, "text": "over REST"}, headers=headers)
+    assert response.status_code == 200, response.text
+    response = await client.get(f"/chat/history/{chat.id}", headers=headers)
+    assert [m["text"] for m in response.json()] == ["over REST"]
+
+    with TestClient(app).websocket_connect(f"/chat/ws?token={token}&chat_id={chat.id}") as websocket:
+        websocket.send_text(json.dumps({"text": "over websocket"}))
+        assert json.loads(websocket.receive_text())["text"] == "over websocket"
+
+    message_queries.clear()
+    response = await client.get(f"/chat/history/{chat.id}", headers=headers)
+    assert [m["text"] for m in response.json()] == ["over REST", "over websocket"]
+    assert message_queries == []
+
+@pytest.mark.asyncio
+async def test_chat_lock_is_dropped_after_release():
+    async with manager.chat_lock(1):
+        assert 1 in manager.chat_locks
+    assert manager.chat_locks == {}
+    assert manager.chat_lock_holders == {}
+
+@pytest.mark.asyncio
+async def test_history_rejects_negative_paging(client, db_session):
+    user = User(name="PagingUser", email="paginguser@example.com", hashed_password=get_password_hash("password"))
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    token = create_access_token(data={"sub": str(user.id)}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/chat/history/1?limit=-1", headers=headers)
+    assert response.status_code == 422
+    response = await client.get("/chat/history/1?offset=-1", headers=headers)
+    assert response.status_code == 422
@@ -0,0 +1,97 @@
+import datetime
+from types import SimpleNamespace
+from app.history_cache import HistoryCache
+
+def make_message(message_id, chat_id=1):
+    return SimpleNamespace(
+        id=message_id,
+        chat_id=chat_id,
+        sender_id=1,
+        text=f"message {message_id}",
+        timestamp=datetime.datetime(2024, 1, 1) + datetime.timedelta(seconds=message_id),
+        read=False
+    )
+
+def test_tail_keeps_newest_messages():
+    cache = HistoryCache(chat_size=3, max_messages=100, ttl=60)
+    cache.fill(1, 0, [])
+    for message_id in range(1, 6):
+        cache.append(make_message(message_id))
+
+    assert [m["id"] for m in cache.get_page(1, 2, 10)] == [3, 4, 5]
+    assert [m["id"] for m in cache.get_page(1, 3, 1)] == [4]
+    assert cache.get_page(1, 1, 10) is None
+    assert cache.get_page(1, 5, 10) == []
+
+def test_mark_read_updates_cached_entry():
+    cache = HistoryCache(chat_size=3, max_messages=100, ttl=60)
+    cache.fill(1, 0, [])
+    cache.append(make_message(1))
+    cache.mark_read(1, 1)
+
+    assert cache.get_page(1, 0, 10)[0]["read"] is True
+
+def test_idle_chats_are_evicted_first():
+    cache = HistoryCache(chat_size=2, max_messages=6, ttl=60)
+    for chat_id in (1, 2):
+        cache.fill(chat_id, 0, [])
+        cache.append(make_message(chat_id * 10, chat_id))
+        cache.append(make_message(chat_id * 10 + 1, chat_id))
+    cache.get_page(1, 0, 10)
+    cache.fill(3, 0, [])
+
+    assert set(cache.chats) == {1, 3}
+    assert cache.size <= 6
+
+def test_messages_for_unknown_chats_are_ignored():
+    cache = HistoryCache(chat_size=2, max_messages=6, ttl=60)
+    cache.append(make_message(1))
+
+    assert cache.get_page(1, 0, 10) is None
+    assert cache.size == 0
+
+def test_tails_expire_after_ttl():
+    cache = HistoryCache(chat_size=2, max_messages=6, ttl=60)
+    cache.fill(1, 0, [])
+    cache.chats[1].loaded_at -= 60
+
+    assert cache.get_page(1, 0, 10) is None
+    assert 1 not in cache.chats
+    assert cache.size == 0
+
+def test_fill_is_dropped_after_concurrent_write():
+    cache = HistoryCache(chat_size=2, max_messages=6, ttl=60)
+    version = cache.version(1)
+    cache.mark_read(1, 1)
+    cache.fill(1, 1, [{"id": 1, "read": False}], version)
+
+    assert cache.get_page(1, 0, 10) is None
+
+def test_write_to_other_chat_keeps_fill():
+    cache = HistoryCache(chat_size=2, max_messages=6, ttl=60)
+    version = cache.version(1)
+    cache.append(make_message(5, chat_id=2))
+    cache.mark_read(7, 5)
+    cache.fill(1, 1, [{"id": 1, "read": False}], version)
+
+    assert [m["id"] for m in cache.get_page(1, 0, 10)] == [1]
+
+def test_dropped_versions_still_cancel_fill():
+    cache = HistoryCache(chat_size=2, max_messages=2, ttl=60)
+    version = cache.version(1)
+    cache.append(make_message(1, chat_id=1))
+    cache.append(make_message(2, chat_id=2))
+    cache.append(make_message(3, chat_id=3))
+    cache.fill(1, 1, [{"id": 1, "read": False}], version)
+
+    assert 1 not in cache.versions
+    assert cache.get_page(1, 0, 10) is None
+
+def test_append_skips_message_already_in_tail():
+    cache = HistoryCache(chat_size=2, max_messages=6, ttl=60)
+    message = make_message(1)
+    cache.fill(1, 1, [{"id": 1, "read": False}])
+    cache.append(message)
+
+    assert cache.chats[1].total == 1
+    assert len(cache.get_page(1, 0, 10)) == 1